@@ -1,4 +1,6 @@
 # 2MainOrchestrator.ps1 for PBIP file deployment (Complete Fixed Version)
+# Run with -Verbose to include per-item listings in the log
+[CmdletBinding()]
 param(
     [Parameter(Mandatory=$true)]
     [string]$Workspace,
@@ -15,6 +17,21 @@ Write-Host "Config File: $ConfigFile"
 # UTILITY FUNCTIONS
 # ===============================
 
+# Shared web session so the token call and every Fabric API call reuse the same
+# keep-alive connections instead of opening a new TCP/TLS connection per request
+$script:FabricSession = New-Object Microsoft.PowerShell.Commands.WebRequestSession
+
+# Per-request timeouts: on PowerShell 7 Invoke-RestMethod otherwise waits indefinitely on a stalled connection.
+# Definition uploads carry every part inline, so they get a longer budget than lookups and polls.
+# Each session is only ever used with one timeout: on PowerShell 7.4+ changing it between calls
+# rebuilds the session's HttpClient and drops its pooled connections, so uploads get their own session.
+$script:RequestTimeoutSec = 100
+$script:UploadTimeoutSec = 600
+$script:FabricUploadSession = New-Object Microsoft.PowerShell.Commands.WebRequestSession
+
+# Fabric REST API root; endpoints below append their workspace-relative path
+$script:FabricApiBase = 'https://api.fabric.microsoft.com/v1'
+
 function Get-SPNToken {
     param (
         [Parameter(Mandatory=$true)]
@@ -37,7 +54,7 @@ function Get-SPNToken {
             scope         = "https://api.fabric.microsoft.com/.default"
         }
         
-        $tokenResponse = Invoke-RestMethod -Uri "https://login.microsoftonline.com/$TenantId/oauth2/v2.0/token" -Method Post -Body $body
+        $tokenResponse = Invoke-RestMethod -Uri "https://login.microsoftonline.com/$TenantId/oauth2/v2.0/token" -WebSession $script:FabricSession -TimeoutSec $script:RequestTimeoutSec -Method Post -Body $body
         $accessToken = $tokenResponse.access_token
         
         Write-Host "✓ Successfully acquired Fabric API access token"
@@ -57,7 +74,7 @@ function Get-SPNToken {
                 resource      = "https://analysis.windows.net/powerbi/api"
             }
             
-            $tokenResponse = Invoke-RestMethod -Uri "https://login.microsoftonline.com/$TenantId/oauth2/token" -Method Post -Body $body
+            $tokenResponse = Invoke-RestMethod -Uri "https://login.microsoftonline.com/$TenantId/oauth2/token" -WebSession $script:FabricSession -TimeoutSec $script:RequestTimeoutSec -Method Post -Body $body
             $accessToken = $tokenResponse.access_token
             
             Write-Host "✓ Successfully acquired Power BI API access token as fallback"
@@ -77,30 +94,34 @@ function Get-PBIPFiles {
     )
 
     if ($Folder) {
-        Write-Host "Folder path : $Folder"
         $target = Join-Path $ArtifactPath $Folder
     } else {
         $target = $ArtifactPath
     }
 
-    if (-not (Test-Path $target)) {
-        Write-Warning "Path not found: $target"
+    # Single existence probe; callers loop over candidate folders and rely on this check
+    if (-not (Test-Path -LiteralPath $target -PathType Container)) {
+        Write-Verbose "Path not found: $target"
         return @()
     }
+    if ($Folder) { Write-Host "Folder path : $Folder" }
 
-    $files = Get-ChildItem -Path $target -Recurse -File -Filter '*.pbip'
+    $files = Get-ChildItem -LiteralPath $target -Recurse -File -Filter '*.pbip'
     Write-Host "Found $($files.Count) PBIP files in $target"
     
-    foreach ($file in $files) {
-        Write-Host "  Found PBIP: $($file.FullName)"
-        
-        $parentDir = $file.Directory.FullName
-        $baseName = [System.IO.Path]::GetFileNameWithoutExtension($file.Name)
-        $reportFolder = Join-Path $parentDir "$baseName.Report"
-        $semanticModelFolder = Join-Path $parentDir "$baseName.SemanticModel"
-        
-        Write-Host "    Report folder: $(Test-Path $reportFolder)"
-        Write-Host "    SemanticModel folder: $(Test-Path $semanticModelFolder)"
+    # Per-file details are verbose-only; Validate-PBIPStructure checks the folders again before deploying
+    if ($VerbosePreference -ne 'SilentlyContinue') {
+        foreach ($file in $files) {
+            Write-Verbose "  Found PBIP: $($file.FullName)"
+            
+            $parentDir = $file.Directory.FullName
+            $baseName = [System.IO.Path]::GetFileNameWithoutExtension($file.Name)
+            $reportFolder = Join-Path $parentDir "$baseName.Report"
+            $semanticModelFolder = Join-Path $parentDir "$baseName.SemanticModel"
+            
+            Write-Verbose "    Report folder: $(Test-Path $reportFolder)"
+            Write-Verbose "    SemanticModel folder: $(Test-Path $semanticModelFolder)"
+        }
     }
 
     return $files
@@ -117,7 +138,10 @@ function Validate-PBIPStructure {
     $reportFolder = Join-Path $pbipDir "$baseName.Report"
     $semanticModelFolder = Join-Path $pbipDir "$baseName.SemanticModel"
     
-    $isValid = (Test-Path $reportFolder) -and (Test-Path $semanticModelFolder)
+    # Probe each folder once and reuse the results for the warnings below
+    $hasReportFolder = Test-Path $reportFolder
+    $hasSemanticModelFolder = Test-Path $semanticModelFolder
+    $isValid = $hasReportFolder -and $hasSemanticModelFolder
     
     if ($isValid) {
         Write-Host "✓ PBIP structure validated for: $baseName"
@@ -137,8 +161,8 @@ function Validate-PBIPStructure {
         }
     } else {
         Write-Warning "Invalid PBIP structure for: $baseName"
-        Write-Warning "  Missing Report folder: $(-not (Test-Path $reportFolder))"
-        Write-Warning "  Missing SemanticModel folder: $(-not (Test-Path $semanticModelFolder))"
+        Write-Warning "  Missing Report folder: $(-not $hasReportFolder)"
+        Write-Warning "  Missing SemanticModel folder: $(-not $hasSemanticModelFolder)"
         
         return @{
             IsValid = $false
@@ -162,25 +186,97 @@ function Verify-WorkspaceAccess {
             "Content-Type" = "application/json"
         }
         
-        $uri = "https://api.fabric.microsoft.com/v1/workspaces/$WorkspaceId"
-        $response = Invoke-RestMethod -Uri $uri -Method Get -Headers $headers
+        $uri = "$script:FabricApiBase/workspaces/$WorkspaceId"
+        $response = Invoke-RestMethod -Uri $uri -WebSession $script:FabricSession -TimeoutSec $script:RequestTimeoutSec -Method Get -Headers $headers
         
         Write-Host "✓ Workspace access verified: $($response.displayName)"
         return $true
     }
     catch {
-        Write-Error "Failed to access workspace: $_"
+        Write-Error "Failed to access workspace: $(Get-BoundedText "$_")"
         return $false
     }
 }
 
+function Get-BoundedText {
+    param(
+        [string]$Text,
+        [int]$MaxLength = 4096
+    )
+
+    # Error bodies can be whole HTML pages; keep log lines to a bounded excerpt
+    if ($Text -and $Text.Length -gt $MaxLength) {
+        return $Text.Substring(0, $MaxLength) + "... (truncated, $($Text.Length) chars)"
+    }
+    return $Text
+}
+
+function Find-WorkspaceItem {
+    param(
+        [Parameter(Mandatory=$true)]
+        [string]$WorkspaceId,
+        [Parameter(Mandatory=$true)]
+        [string]$AccessToken,
+        [Parameter(Mandatory=$true)]
+        [string]$DisplayName,
+        [Parameter(Mandatory=$true)]
+        [string]$ItemType
+    )
+
+    $headers = @{
+        "Authorization" = "Bearer $AccessToken"
+        "Content-Type" = "application/json"
+    }
+
+    # List Items filters by type on the server; the name is matched here, following continuation pages
+    $uri = "$script:FabricApiBase/workspaces/$WorkspaceId/items?type=$([uri]::EscapeDataString($ItemType))"
+    while ($uri) {
+        $response = Invoke-RestMethod -Uri $uri -WebSession $script:FabricSession -TimeoutSec $script:RequestTimeoutSec -Method Get -Headers $headers -ErrorAction Stop
+        foreach ($item in $response.value) {
+            if ($item.displayName -eq $DisplayName -and $item.type -eq $ItemType) { return $item }
+        }
+        $uri = $response.continuationUri
+    }
+    return $null
+}
+
+function New-DefinitionPart {
+    param(
+        [Parameter(Mandatory=$true)]
+        [string]$Path,
+        [Parameter(Mandatory=$true)]
+        [AllowEmptyCollection()]
+        [byte[]]$Bytes
+    )
+
+    # Single builder for the InlineBase64 parts used by both semantic model and report definitions
+    return @{
+        path        = $Path
+        payload     = [Convert]::ToBase64String($Bytes)
+        payloadType = 'InlineBase64'
+    }
+}
+
+function Get-NextPollDelay {
+    param(
+        [Parameter(Mandatory=$true)]
+        [double]$CurrentDelay,
+        [double]$MaxDelay = 10
+    )
+
+    # Exponential backoff (x1.3) with +/-10% jitter; the cap is applied last so no delay exceeds MaxDelay seconds
+    $next = $CurrentDelay * 1.3 * (Get-Random -Minimum 0.9 -Maximum 1.1)
+    return [math]::Min($next, $MaxDelay)
+}
+
 function Wait-FabricOperationCompletion {
     param(
         [Parameter(Mandatory=$true)]
         [string]$OperationStatusUrl,
         [Parameter(Mandatory=$true)]
         [string]$AccessToken,
-        [int]$MaxWaitSeconds = 180
+        [int]$MaxWaitSeconds = 180,
+        [double]$InitialDelaySeconds = 1.0
     )
 
     $headers = @{
@@ -188,28 +284,99 @@ function Wait-FabricOperationCompletion {
         "Content-Type" = "application/json"
     }
 
-    $elapsed = 0
-    $interval = 5
-    while ($elapsed -lt $MaxWaitSeconds) {
+    $stopwatch = [System.Diagnostics.Stopwatch]::StartNew()
+    $delay = $InitialDelaySeconds
+    while ($stopwatch.Elapsed.TotalSeconds -lt $MaxWaitSeconds) {
         try {
-            $resp = Invoke-RestMethod -Uri $OperationStatusUrl -Method Get -Headers $headers -ErrorAction Stop
+            $resp = Invoke-RestMethod -Uri $OperationStatusUrl -WebSession $script:FabricSession -TimeoutSec $script:RequestTimeoutSec -Method Get -Headers $headers -ErrorAction Stop
             $status = $resp.status
             if (-not $status) { $status = $resp.state }
             if ($status -and ($status -in @('Succeeded','Completed'))) { return $true }
             if ($status -and ($status -in @('Failed','Error'))) {
-                Write-Error "Fabric operation failed: $($resp | ConvertTo-Json -Depth 10)"
+                Write-Error "Fabric operation failed: $(Get-BoundedText ($resp | ConvertTo-Json -Depth 10))"
                 return $false
             }
         } catch {
             Write-Warning "Failed to poll operation status: $($_.Exception.Message)"
         }
-        Start-Sleep -Seconds $interval
-        $elapsed += $interval
+        $remaining = $MaxWaitSeconds - $stopwatch.Elapsed.TotalSeconds
+        if ($remaining -le 0) { break }
+        Start-Sleep -Milliseconds ([int](1000 * [math]::Min($delay, $remaining)))
+        $delay = Get-NextPollDelay -CurrentDelay $delay -MaxDelay 10
     }
     Write-Warning "Operation did not complete within $MaxWaitSeconds seconds"
     return $false
 }
 
+function Invoke-FabricCreate {
+    param(
+        [Parameter(Mandatory=$true)]
+        [string]$Uri,
+        [Parameter(Mandatory=$true)]
+        [string]$Body,
+        [Parameter(Mandatory=$true)]
+        [string]$AccessToken,
+        [int]$MaxWaitSeconds = 300
+    )
+
+    $headers = @{
+        "Authorization" = "Bearer $AccessToken"
+        "Content-Type" = "application/json"
+    }
+
+    # Invoke-WebRequest (not -RestMethod) so a 202 Location header is available.
+    # HTTP errors (e.g. 409) are left to the caller, which may want the status code.
+    $createResponse = Invoke-WebRequest -Uri $Uri -UseBasicParsing -WebSession $script:FabricUploadSession -TimeoutSec $script:UploadTimeoutSec -Method Post -Headers $headers -Body $Body -ErrorAction Stop
+    $response = if ($createResponse.Content) { $createResponse.Content | ConvertFrom-Json } else { $null }
+    if ($null -ne $response -and $response.id) { return $response.id }
+
+    # Long-running create: follow the operation Fabric hands back instead of listing the workspace
+    $operationUrl = if ($createResponse.Headers['Location']) { @($createResponse.Headers['Location'])[0] } else { $null }
+    if ($createResponse.StatusCode -ne 202 -or -not $operationUrl) { return $null }
+
+    Write-Host "ℹ️ Create accepted; following operation status..."
+    # Seed the poll interval with the Retry-After Fabric suggests, if it sent one
+    $initialDelay = 1.0
+    $retryAfter = 0
+    if ($createResponse.Headers['Retry-After'] -and [int]::TryParse([string](@($createResponse.Headers['Retry-After'])[0]), [ref]$retryAfter) -and $retryAfter -gt 0) {
+        $initialDelay = [double]$retryAfter
+    }
+    # A failed or timed-out operation is final; callers must not go on to wait for the item
+    if (-not (Wait-FabricOperationCompletion -OperationStatusUrl $operationUrl -AccessToken $AccessToken -MaxWaitSeconds $MaxWaitSeconds -InitialDelaySeconds $initialDelay)) {
+        throw "❌ Create operation did not succeed."
+    }
+    try {
+        $operationResult = Invoke-RestMethod -Uri "$operationUrl/result" -WebSession $script:FabricSession -TimeoutSec $script:RequestTimeoutSec -Method Get -Headers $headers -ErrorAction Stop
+        if ($operationResult.id) { return $operationResult.id }
+    }
+    catch { Write-Warning "Could not read operation result: $($_.Exception.Message)" }
+    return $null
+}
+
+function Get-AllWorkspaceItems {
+    param(
+        [Parameter(Mandatory=$true)]
+        [string]$WorkspaceId,
+        [Parameter(Mandatory=$true)]
+        [string]$AccessToken
+    )
+
+    $headers = @{
+        "Authorization" = "Bearer $AccessToken"
+        "Content-Type" = "application/json"
+    }
+
+    # List Items is paged; follow continuationUri so large workspaces are listed in full
+    $items = New-Object System.Collections.Generic.List[object]
+    $uri = "$script:FabricApiBase/workspaces/$WorkspaceId/items"
+    while ($uri) {
+        $response = Invoke-RestMethod -Uri $uri -WebSession $script:FabricSession -TimeoutSec $script:RequestTimeoutSec -Method Get -Headers $headers -ErrorAction Stop
+        foreach ($item in $response.value) { $items.Add($item) }
+        $uri = $response.continuationUri
+    }
+    return ,$items.ToArray()
+}
+
 function List-WorkspaceItems {
     param(
         [Parameter(Mandatory=$true)]
@@ -219,20 +386,14 @@ function List-WorkspaceItems {
     )
     
     try {
-        $headers = @{
-            "Authorization" = "Bearer $AccessToken"
-            "Content-Type" = "application/json"
-        }
-        
-        $uri = "https://api.fabric.microsoft.com/v1/workspaces/$WorkspaceId/items"
-        $response = Invoke-RestMethod -Uri $uri -Method Get -Headers $headers
+        $items = Get-AllWorkspaceItems -WorkspaceId $WorkspaceId -AccessToken $AccessToken
         
-        Write-Host "Workspace items found: $($response.value.Count)"
-        foreach ($item in $response.value) {
-            Write-Host "  - $($item.displayName) ($($item.type))"
+        Write-Host "Workspace items found: $($items.Count)"
+        foreach ($item in $items) {
+            Write-Verbose "  - $($item.displayName) ($($item.type))"
         }
         
-        return $response.value
+        return $items
     }
     catch {
         Write-Warning "Failed to list workspace items: $_"
@@ -271,7 +432,8 @@ function Debug-PBIPContent {
             $modelFiles = Get-ChildItem $semanticModelFolder -Recurse
             Write-Host "  - Semantic model files: $($modelFiles.Count)"
             
-            $modelBim = Get-ChildItem $semanticModelFolder -Filter "model.bim" -Recurse
+            # Reuse the listing above (and its cached file sizes) instead of walking the folder again
+            $modelBim = $modelFiles | Where-Object { -not $_.PSIsContainer -and $_.Name -eq 'model.bim' } | Select-Object -First 1
             if ($modelBim) {
                 $modelSize = [math]::Round($modelBim.Length / 1KB, 2)
                 Write-Host "  - Model.bim size: $modelSize KB"
@@ -293,12 +455,13 @@ function Wait-ForDeploymentCompletion {
         [string]$ItemName,
         [Parameter(Mandatory=$true)]
         [string]$ItemType,   # "Report" or "SemanticModel"
+        [string]$ItemId = $null,
         [int]$MaxWaitMinutes = 5
     )
     
     $maxWaitTime = $MaxWaitMinutes * 60
-    $waitTime = 0
-    $checkInterval = 15
+    $stopwatch = [System.Diagnostics.Stopwatch]::StartNew()
+    $delay = 1.0
     
     Write-Host "⏳ Waiting for $ItemType '$ItemName' to appear in workspace..."
     
@@ -307,17 +470,16 @@ function Wait-ForDeploymentCompletion {
         "Content-Type"  = "application/json"
     }
     
-    do {
-        Start-Sleep -Seconds $checkInterval
-        $waitTime += $checkInterval
-        
+    # Known ID → fetch the single item instead of listing the workspace; the URL is fixed for the whole wait
+    $itemUri = if ($ItemId) { "$script:FabricApiBase/workspaces/$WorkspaceId/items/$ItemId" } else { $null }
+    
+    while ($stopwatch.Elapsed.TotalSeconds -lt $maxWaitTime) {
         try {
-            # Always use unified items endpoint in Fabric
-            $uri = "https://api.fabric.microsoft.com/v1/workspaces/$WorkspaceId/items"
-            $response = Invoke-RestMethod -Uri $uri -Method Get -Headers $headers -ErrorAction Stop
-            
-            $item = $response.value | Where-Object { 
-                $_.displayName -eq $ItemName -and $_.type -eq $ItemType 
+            if ($itemUri) {
+                $item = Invoke-RestMethod -Uri $itemUri -WebSession $script:FabricSession -TimeoutSec $script:RequestTimeoutSec -Method Get -Headers $headers -ErrorAction Stop
+            }
+            else {
+                $item = Find-WorkspaceItem -WorkspaceId $WorkspaceId -AccessToken $AccessToken -DisplayName $ItemName -ItemType $ItemType
             }
             
             if ($item) {
@@ -330,14 +492,18 @@ function Wait-ForDeploymentCompletion {
                 }
             }
             else {
-                Write-Host "⏳ Still waiting... ($waitTime/$maxWaitTime seconds)"
+                Write-Host "⏳ Still waiting... ($([int]$stopwatch.Elapsed.TotalSeconds)/$maxWaitTime seconds)"
             }
         }
         catch {
             Write-Warning "Error checking for item: $($_.Exception.Message)"
         }
         
-    } while ($waitTime -lt $maxWaitTime)
+        $remaining = $maxWaitTime - $stopwatch.Elapsed.TotalSeconds
+        if ($remaining -le 0) { break }
+        Start-Sleep -Milliseconds ([int](1000 * [math]::Min($delay, $remaining)))
+        $delay = Get-NextPollDelay -CurrentDelay $delay -MaxDelay 15
+    }
     
     Write-Warning "❌ $ItemType '$ItemName' not found after $MaxWaitMinutes minutes"
     return $false
@@ -357,30 +523,25 @@ function Verify-DeploymentResult {
     )
     
     try {
-        $headers = @{
-            "Authorization" = "Bearer $AccessToken"
-            "Content-Type" = "application/json"
-        }
+        # Get all workspace items, every page
+        $items = Get-AllWorkspaceItems -WorkspaceId $WorkspaceId -AccessToken $AccessToken
         
-        # Get all workspace items
-        $uri = "https://api.fabric.microsoft.com/v1/workspaces/$WorkspaceId/items"
-        $response = Invoke-RestMethod -Uri $uri -Method Get -Headers $headers
-        
-        # Check for semantic model
-        $semanticModel = $response.value | Where-Object { 
-            $_.displayName -eq $SemanticModelName -and $_.type -eq "SemanticModel" 
+        # Index the listing once by type|name (case-insensitive, like -eq) instead of scanning it per item type
+        $itemsByKey = @{}
+        foreach ($item in $items) {
+            $key = "$($item.type)|$($item.displayName)"
+            if (-not $itemsByKey.ContainsKey($key)) { $itemsByKey[$key] = $item }
         }
         
-        # Check for report
-        $report = $response.value | Where-Object { 
-            $_.displayName -eq $ReportName -and $_.type -eq "Report" 
-        }
+        $semanticModel = $itemsByKey["SemanticModel|$SemanticModelName"]
+        $report = $itemsByKey["Report|$ReportName"]
         
         return @{
             SemanticModelFound = ($semanticModel -ne $null)
             ReportFound = ($report -ne $null)
             SemanticModelId = if ($semanticModel) { $semanticModel.id } else { $null }
             ReportId = if ($report) { $report.id } else { $null }
+            ItemCount = $items.Count
         }
     }
     catch {
@@ -390,6 +551,7 @@ function Verify-DeploymentResult {
             ReportFound = $false
             SemanticModelId = $null
             ReportId = $null
+            ItemCount = $null
         }
     }
 }
@@ -407,34 +569,53 @@ function Deploy-SemanticModel {
         [Parameter(Mandatory=$true)]
         [string]$ServerName,
         [Parameter(Mandatory=$true)]
-        [string]$DatabaseName
+        [string]$DatabaseName,
+        [string]$ModelBimPath = $null
     )
-    $deployedModelId   = $null
-    $deployedModelName = $null
 
     try {
         Write-Host "Deploying semantic model: $ModelName"
 
-        $modelBimFile = Get-ChildItem -Path $SemanticModelFolder -Filter "model.bim" -Recurse | Select-Object -First 1
-        if (-not $modelBimFile) { throw "model.bim file not found in semantic model folder" }
-
-        $modelDefinitionRaw = Get-Content $modelBimFile.FullName -Raw
-        $modelJson = $modelDefinitionRaw | ConvertFrom-Json
+        # Validate-PBIPStructure has already located model.bim; only walk the folder when no path was passed
+        if (-not $ModelBimPath) {
+            $found = Get-ChildItem -LiteralPath $SemanticModelFolder -Filter "model.bim" -Recurse | Select-Object -First 1
+            if ($found) { $ModelBimPath = $found.FullName }
+        }
+        if (-not $ModelBimPath) { throw "model.bim file not found in semantic model folder" }
 
-        # Connection switching
-        $pattern = 'Sql\.Database\(".*?"\s*,\s*".*?"(?:\s*,\s*\[.*?\])?\)'
-        $replacement = 'Sql.Database("' + $ServerName + '", "' + $DatabaseName + '")'
+        # Read the bytes once; text is only decoded for the connection check and parse
+        $modelBimBytes = [System.IO.File]::ReadAllBytes($ModelBimPath)
+        $bomLength = 0
+        if ($modelBimBytes.Length -ge 3 -and $modelBimBytes[0] -eq 0xEF -and $modelBimBytes[1] -eq 0xBB -and $modelBimBytes[2] -eq 0xBF) { $bomLength = 3 }
+        $modelDefinitionRaw = [System.Text.Encoding]::UTF8.GetString($modelBimBytes, $bomLength, $modelBimBytes.Length - $bomLength)
         $updatesApplied = 0
 
-        foreach ($table in $modelJson.model.tables) {
-            foreach ($partition in $table.partitions) {
-                if ($partition.source -and $partition.source.type -eq 'm' -and $partition.source.expression) {
-                    if ($partition.source.expression -is [System.Array]) {
-                        $partition.source.expression = $partition.source.expression | ForEach-Object { $_ -replace $pattern, $replacement }
-                        $updatesApplied++
-                    } elseif ($partition.source.expression -is [string]) {
-                        $partition.source.expression = $partition.source.expression -replace $pattern, $replacement
-                        $updatesApplied++
+        # Only parse the model when it has a Sql.Database(...) source to switch; otherwise it ships untouched
+        if ($modelDefinitionRaw.Contains('Sql.Database(')) {
+            $modelJson = $modelDefinitionRaw | ConvertFrom-Json
+
+            # Connection switching
+            $pattern = 'Sql\.Database\(".*?"\s*,\s*".*?"(?:\s*,\s*\[.*?\])?\)'
+            $replacement = 'Sql.Database("' + $ServerName + '", "' + $DatabaseName + '")'
+
+            foreach ($table in $modelJson.model.tables) {
+                foreach ($partition in $table.partitions) {
+                    if ($partition.source -and $partition.source.type -eq 'm' -and $partition.source.expression) {
+                        # Only count partitions whose expression actually changed
+                        $original = $partition.source.expression
+                        if ($original -is [System.Array]) {
+                            $updated = @($original | ForEach-Object { $_ -replace $pattern, $replacement })
+                            if (($updated -join "`n") -cne ($original -join "`n")) {
+                                $partition.source.expression = $updated
+                                $updatesApplied++
+                            }
+                        } elseif ($original -is [string]) {
+                            $updated = $original -replace $pattern, $replacement
+                            if ($updated -cne $original) {
+                                $partition.source.expression = $updated
+                                $updatesApplied++
+                            }
+                        }
                     }
                 }
             }
@@ -442,41 +623,46 @@ function Deploy-SemanticModel {
 
         if ($updatesApplied -gt 0) {
             Write-Host "✓ Connection switching applied to $updatesApplied partition(s)"
+            $modelDefinitionBytes = [System.Text.Encoding]::UTF8.GetBytes(($modelJson | ConvertTo-Json -Depth 100))
+        }
+        else {
+            # Nothing was rewritten → send the original model.bim bytes without re-encoding,
+            # minus any UTF-8 BOM so the payload matches what the re-serialized path sends
+            Write-Host "No connection strings needed switching; using model.bim unchanged"
+            if ($bomLength -gt 0) {
+                $modelDefinitionBytes = New-Object byte[] ($modelBimBytes.Length - $bomLength)
+                [Array]::Copy($modelBimBytes, $bomLength, $modelDefinitionBytes, 0, $modelDefinitionBytes.Length)
+            }
+            else {
+                $modelDefinitionBytes = $modelBimBytes
+            }
         }
-
-        $modelDefinition = $modelJson | ConvertTo-Json -Depth 100
 
         # Build parts
         $smParts = @()
-        $smDir = Split-Path $modelBimFile.FullName -Parent
-        $smParts += @{
-            path = 'model.bim'
-            payload = [Convert]::ToBase64String([System.Text.Encoding]::UTF8.GetBytes($modelDefinition))
-            payloadType = 'InlineBase64'
-        }
+        $smDir = Split-Path $ModelBimPath -Parent
+        $smParts += New-DefinitionPart -Path 'model.bim' -Bytes $modelDefinitionBytes
+        # List the folder once and look optional parts up by name instead of probing each path
+        $smFiles = @{}
+        foreach ($entry in Get-ChildItem -LiteralPath $smDir -File) { $smFiles[$entry.Name] = $entry }
         foreach ($optional in @('diagramLayout.json','definition.pbism')) {
-            $optPath = Join-Path $smDir $optional
-            if (Test-Path $optPath) {
-                $bytes = [System.IO.File]::ReadAllBytes($optPath)
-                $smParts += @{ path = $optional; payload = [Convert]::ToBase64String($bytes); payloadType = 'InlineBase64' }
+            if ($smFiles.ContainsKey($optional)) {
+                $smParts += New-DefinitionPart -Path $optional -Bytes ([System.IO.File]::ReadAllBytes($smFiles[$optional].FullName))
             }
         }
 
         $headers = @{ "Authorization" = "Bearer $AccessToken"; "Content-Type" = "application/json" }
 
         # 🔑 Step 1: Check if model exists already
-        $listUrl = "https://api.fabric.microsoft.com/v1/workspaces/$WorkspaceId/semanticModels"
-        $listResponse = Invoke-RestMethod -Uri $listUrl -Method Get -Headers $headers
-        $existingModel = $listResponse.value | Where-Object { $_.displayName -eq $ModelName } | Select-Object -First 1
+        $existingModel = Find-WorkspaceItem -WorkspaceId $WorkspaceId -AccessToken $AccessToken -DisplayName $ModelName -ItemType 'SemanticModel'
 
         if ($existingModel) {
             Write-Host "Semantic model already exists (ID: $($existingModel.id)) → updating definition..."
-            $updateUrl = "https://api.fabric.microsoft.com/v1/workspaces/$WorkspaceId/semanticModels/$($existingModel.id)/updateDefinition"
-            $updatePayload = @{ definition = @{ parts = $smParts } } | ConvertTo-Json -Depth 50
-            Invoke-RestMethod -Uri $updateUrl -Method Post -Body $updatePayload -Headers $headers
+            $updateUrl = "$script:FabricApiBase/workspaces/$WorkspaceId/semanticModels/$($existingModel.id)/updateDefinition"
+            $updatePayload = @{ definition = @{ parts = $smParts } } | ConvertTo-Json -Depth 50 -Compress
+            # Discard the response body so it does not leak into this function's return value
+            $null = Invoke-RestMethod -Uri $updateUrl -WebSession $script:FabricUploadSession -TimeoutSec $script:UploadTimeoutSec -Method Post -Body $updatePayload -Headers $headers
             Write-Host "✓ Semantic model updated successfully"
-            $deployedModelId = $existingModel.id
-            $deployedModelName = $existingModel.displayName
             return @{ Success = $true; ModelId = $existingModel.id }
         }
         else {
@@ -485,53 +671,26 @@ function Deploy-SemanticModel {
                 displayName = $ModelName
                 description = "Semantic model deployed from PBIP: $ModelName"
                 definition = @{ parts = $smParts }
-            } | ConvertTo-Json -Depth 50
-
-            $deployUrl = "https://api.fabric.microsoft.com/v1/workspaces/$WorkspaceId/semanticModels"
-            $createResp = Invoke-RestMethod -Uri $deployUrl -Method Post -Body $deploymentPayload -Headers $headers
-            Write-Host "✓ Semantic model created successfully (ID: $($createResp.id))"
-            $deployedModelId =  $createResp.id 
-            $deployedModelName = $createResp.displayName 
-            return @{ Success = $true; ModelId = $createResp.id }
+            } | ConvertTo-Json -Depth 50 -Compress
+
+            $deployUrl = "$script:FabricApiBase/workspaces/$WorkspaceId/semanticModels"
+            $modelId = Invoke-FabricCreate -Uri $deployUrl -Body $deploymentPayload -AccessToken $AccessToken
+            if (-not $modelId) {
+                # No ID in the response or operation result → look the new model up by name once
+                $createdModel = Find-WorkspaceItem -WorkspaceId $WorkspaceId -AccessToken $AccessToken -DisplayName $ModelName -ItemType 'SemanticModel'
+                if ($createdModel) { $modelId = $createdModel.id }
+            }
+            # The report binds to this ID, so a create without one is not a usable success
+            if (-not $modelId) { throw "Semantic model was created but its ID could not be determined" }
+            Write-Host "✓ Semantic model created successfully (ID: $modelId)"
+            return @{ Success = $true; ModelId = $modelId }
         }
 
     } catch {
-        Write-Error "Failed to deploy semantic model: $($_)"
-        return @{ Success = $false; deployedModelId = $null; Error = "$($_)" }
+        $errorText = Get-BoundedText "$($_)"
+        Write-Error "Failed to deploy semantic model: $errorText"
+        return @{ Success = $false; deployedModelId = $null; Error = $errorText }
     }
-    # 🔄 Step 2: Trigger refresh (Fabric API)
-        $refreshUrl = "https://api.fabric.microsoft.com/v1/workspaces/$WorkspaceId/semanticModels/$deployedModelId/refreshes"
-        Write-Host "Triggering refresh for semantic model (ID: $deployedModelId)..."
-        Write-Host "Refresh URL: $refreshUrl"
-        $refreshPayload = "{}" | ConvertTo-Json
-        $refreshHeaders = @{
-             "Authorization" = "Bearer $AccessToken"
-             "Content-Type" = "application/json"
-        }
-        Invoke-RestMethod -Uri $refreshUrl -Method Post -Headers $refreshHeaders -Body $refreshPayload
-        # Invoke-RestMethod -Uri $refreshUrl -Method Post -Headers $headers
-        Write-Host "✓ Refresh triggered (Fabric PBIP model)"
-        
-         try {
-            Invoke-RestMethod `
-                -Uri $refreshUrl `
-                -Method Post `
-                -Headers @{ "Authorization" = "Bearer $AccessToken" }  # ⚡ No Content-Type, No Body
-            Write-Host "✓ Refresh triggered successfully"
-        }
-        catch {
-            Write-Host "❌ Refresh failed: $($_.Exception.Message)"
-        }
-
-        # ✅ Return JSON with id + name
-        $output = @{
-            Success       = $true
-            ModelId       = $deployedModelId
-            Name          = $deployedModelName
-            RefreshStatus = "Triggered"
-        }| ConvertTo-Json -Depth 5
-        Write-Output $output
-
 }
 
 function Deploy-Report {
@@ -548,10 +707,8 @@ function Deploy-Report {
     )
 
     try {
-        Write-Host "--- STEP 6: REPORT DEPLOYMENT ---"
         Write-Host "📦 Deploying PBIP report: $ReportName"
 
-        # ---------- Resolve actual .Report folder ----------
         # ---------- Resolve actual .Report folder ----------
         $reportFolderPath = $null
 
@@ -569,9 +726,9 @@ function Deploy-Report {
             }
             else {
                 # Case C: discover a *.Report folder anywhere beneath ReportFolder
-                $found = Get-ChildItem -Path $ReportFolder -Directory -Recurse -ErrorAction SilentlyContinue |
+                # -Filter is applied by the filesystem enumeration, so only *.Report folders reach the Test-Path checks
+                $found = Get-ChildItem -Path $ReportFolder -Directory -Recurse -Filter '*.Report' -ErrorAction SilentlyContinue |
                     Where-Object {
-                        $_.Name -like '*.Report' -and
                         (Test-Path (Join-Path $_.FullName 'report.json') -ErrorAction SilentlyContinue) -and
                         (Test-Path (Join-Path $_.FullName 'definition.pbir') -ErrorAction SilentlyContinue)
                     } |
@@ -587,34 +744,26 @@ function Deploy-Report {
 
         $reportFolderPath = [System.IO.Path]::GetFullPath($reportFolderPath)
         Write-Host "📁 Using report folder: $reportFolderPath"
-        # ---------- Validate ----------
-        $reportJsonFile = Join-Path $reportFolderPath "report.json"
-        if (-not (Test-Path $reportJsonFile)) { throw "❌ report.json not found in $reportFolderPath" }
+        # report.json and definition.pbir were both confirmed by the folder resolution above
 
         # --- Force bind definition.pbir to semanticModelId ---
         $defPath = Join-Path $reportFolderPath 'definition.pbir'
+        Write-Host "🔗 Forcing definition.pbir to bind report → semanticModelId $SemanticModelId"
 
-        if (Test-Path $defPath) {
-            Write-Host "🔗 Forcing definition.pbir to bind report → semanticModelId $SemanticModelId"
-
-            # Load and overwrite datasetReference
-            $def = Get-Content $defPath -Raw | ConvertFrom-Json
-            $def.datasetReference = @{
-                byConnection = @{
-                    connectionString = "semanticmodelid=$SemanticModelId"
-                }
+        # Load and overwrite datasetReference
+        $def = [System.IO.File]::ReadAllText($defPath) | ConvertFrom-Json
+        $def.datasetReference = @{
+            byConnection = @{
+                connectionString = "semanticmodelid=$SemanticModelId"
             }
+        }
 
-            # Write back to file
-            $jsonOut = $def | ConvertTo-Json -Depth 50
-            $jsonOut | Set-Content $defPath -Encoding UTF8
+        # Write back to file
+        $jsonOut = $def | ConvertTo-Json -Depth 50
+        $jsonOut | Set-Content $defPath -Encoding UTF8
 
-            Write-Host "✅ Updated definition.pbir:"
-            Write-Host $jsonOut
-        }
-        else {
-            Write-Warning "⚠️ No definition.pbir found in $reportFolderPath"
-        }
+        Write-Host "✅ Updated definition.pbir"
+        Write-Verbose $jsonOut
 
 
         # ---------- Build parts from .Report only ----------
@@ -626,23 +775,18 @@ function Deploy-Report {
                 -not $_.Attributes.HasFlag([IO.FileAttributes]::System)
             }
 
-            $parts = @()
+            # List grows in place; '$parts += ...' would copy the whole array for every file
+            $parts = New-Object System.Collections.Generic.List[object]
 
             foreach ($file in $allFiles) {
                 $rel = $file.FullName.Substring($reportFolderPath.Length).TrimStart('\','/')
                 $rel = $rel -replace '\\','/'
 
-                $b64 = [Convert]::ToBase64String([System.IO.File]::ReadAllBytes($file.FullName))
-
-                $parts += @{
-                    path        = $rel
-                    payload     = $b64
-                    payloadType = 'InlineBase64'
-                }
+                $parts.Add((New-DefinitionPart -Path $rel -Bytes ([System.IO.File]::ReadAllBytes($file.FullName))))
             }
 
         Write-Host "✓ Collected $($parts.Count) parts from .Report"
-        $parts | Select-Object -First 5 | ForEach-Object { Write-Host "   - $($_.path)" }
+        foreach ($part in $parts) { Write-Verbose "   - $($part.path)" }
 
         # ---------- Payload ----------
         $itemsReportPayload = @{
@@ -658,85 +802,87 @@ function Deploy-Report {
             Write-Host "🔗 Binding report to semantic model ID: $SemanticModelId"
         }
 
-        $deploymentPayloadJson = $itemsReportPayload | ConvertTo-Json -Depth 50
         $headers = @{
             Authorization = "Bearer $AccessToken"
             "Content-Type" = "application/json"
         }
-        $createUrl = "https://api.fabric.microsoft.com/v1/workspaces/$WorkspaceId/items"
 
-        # ---------- Create ----------
+        # ---------- Existing report? ----------
+        # Look it up first so a redeploy uploads the definition once as an update,
+        # instead of a full create that comes back 409 followed by a second upload
+        $existingReport = $null
         try {
-            $response = Invoke-RestMethod -Uri $createUrl -Method Post -Headers $headers -Body $deploymentPayloadJson -ErrorAction Stop
-
-            $reportId = $null
-            if ($null -ne $response -and $response.id) { $reportId = $response.id }
-            if (-not $reportId) { Write-Host "ℹ️ No immediate body; polling for availability..." }
-
-            # Poll for visibility
-            $filterName = $ReportName.Replace("'", "''")
-            $listUrl = "https://api.fabric.microsoft.com/v1/workspaces/$WorkspaceId/items?`$filter=displayName eq '$filterName' and type eq 'Report'"
-            $timeoutSeconds = 300
-            $intervalSeconds = 15
-            $elapsed = 0
-
-            while ($elapsed -lt $timeoutSeconds -and -not $reportId) {
-                try {
-                    $listResponse = Invoke-RestMethod -Uri $listUrl -Method Get -Headers $headers
-                    $existingReport = $listResponse.value | Select-Object -First 1
-                    if ($existingReport -and $existingReport.id) { $reportId = $existingReport.id; break }
+            $existingReport = Find-WorkspaceItem -WorkspaceId $WorkspaceId -AccessToken $AccessToken -DisplayName $ReportName -ItemType 'Report'
+        }
+        catch { Write-Warning "Could not check for an existing report: $($_.Exception.Message)" }
+
+        if (-not $existingReport) {
+            $deploymentPayloadJson = $itemsReportPayload | ConvertTo-Json -Depth 50 -Compress
+            $createUrl = "$script:FabricApiBase/workspaces/$WorkspaceId/items"
+
+            # ---------- Create ----------
+            try {
+                $reportId = Invoke-FabricCreate -Uri $createUrl -Body $deploymentPayloadJson -AccessToken $AccessToken
+                if (-not $reportId) { Write-Host "ℹ️ No immediate body; polling for availability..." }
+
+                # Poll for visibility
+                $timeoutSeconds = 300
+                $stopwatch = [System.Diagnostics.Stopwatch]::StartNew()
+                $delay = 1.0
+
+                while ($stopwatch.Elapsed.TotalSeconds -lt $timeoutSeconds -and -not $reportId) {
+                    try {
+                        $existingReport = Find-WorkspaceItem -WorkspaceId $WorkspaceId -AccessToken $AccessToken -DisplayName $ReportName -ItemType 'Report'
+                        if ($existingReport -and $existingReport.id) { $reportId = $existingReport.id; break }
+                    }
+                    catch { Write-Warning "Polling error: $($_.Exception.Message)" }
+
+                    $remaining = $timeoutSeconds - $stopwatch.Elapsed.TotalSeconds
+                    if ($remaining -le 0) { break }
+                    $sleepSeconds = [math]::Min($delay, $remaining)
+                    Write-Host "⏳ Waiting $([math]::Round($sleepSeconds, 1)) s..."
+                    Start-Sleep -Milliseconds ([int](1000 * $sleepSeconds))
+                    $delay = Get-NextPollDelay -CurrentDelay $delay -MaxDelay 15
                 }
-                catch { Write-Warning "Polling error: $($_.Exception.Message)" }
 
-                Write-Host "⏳ Waiting $intervalSeconds s..."
-                Start-Sleep -Seconds $intervalSeconds
-                $elapsed += $intervalSeconds
-            }
+                if (-not $reportId) { throw "❌ Report did not become available within $timeoutSeconds seconds." }
 
-            if (-not $reportId) { throw "❌ Report did not become available within $timeoutSeconds seconds." }
+                Write-Host "✅ Report deployed successfully. Report ID: $reportId"
+                return $reportId
+            }
+            catch {
+                # ---------- Handle 409 (created concurrently → update) or bubble up ----------
+                $statusCode = $null
+                try { $statusCode = $_.Exception.Response.StatusCode.Value__ } catch {}
 
-            Write-Host "✅ Report deployed successfully. Report ID: $reportId"
-            return $reportId
-        }
-        catch {
-            # ---------- Handle 409 (exists → update) or bubble up ----------
-            $statusCode = $null
-            try { $statusCode = $_.Exception.Response.StatusCode.Value__ } catch {}
-
-            if ($statusCode -eq 409) {
-                Write-Host "⚠️ Report already exists. Updating definition..."
-
-                $filterName = $ReportName.Replace("'", "''")
-                $listUrl = "https://api.fabric.microsoft.com/v1/workspaces/$WorkspaceId/items?`$filter=displayName eq '$filterName' and type eq 'Report'"
-                $listResponse = Invoke-RestMethod -Uri $listUrl -Method Get -Headers $headers
-                $existingReport = $listResponse.value | Select-Object -First 1
-
-                if ($existingReport) {
-                    $updateUrl = "https://api.fabric.microsoft.com/v1/workspaces/$WorkspaceId/items/$($existingReport.id)/updateDefinition"
-                    $updatePayload = @{
-                    definition = @{
-                        format = 'PBIR'
-                        parts  = $parts
-                    }
+                if ($statusCode -ne 409) {
+                    throw "❌ Report creation failed. Status: $statusCode Message: $($_.Exception.Message)"
                 }
-                    if ($SemanticModelId) { $updatePayload["semanticModelId"] = $SemanticModelId }
 
-                    $updatePayloadJson = $updatePayload | ConvertTo-Json -Depth 50
-                    Invoke-RestMethod -Uri $updateUrl -Method Post -Body $updatePayloadJson -Headers $headers -ErrorAction Stop
-                    Write-Host "✅ Report updated successfully"
-                    return $existingReport.id
-                }
-                else {
-                    throw "❌ Could not find existing report to update."
-                }
+                $existingReport = Find-WorkspaceItem -WorkspaceId $WorkspaceId -AccessToken $AccessToken -DisplayName $ReportName -ItemType 'Report'
+                if (-not $existingReport) { throw "❌ Could not find existing report to update." }
             }
-            else {
-                throw "❌ Report creation failed. Status: $statusCode Message: $($_.Exception.Message)"
+        }
+
+        # ---------- Update ----------
+        Write-Host "⚠️ Report already exists. Updating definition..."
+        $updateUrl = "$script:FabricApiBase/workspaces/$WorkspaceId/items/$($existingReport.id)/updateDefinition"
+        $updatePayload = @{
+            definition = @{
+                format = 'PBIR'
+                parts  = $parts
             }
         }
+        if ($SemanticModelId) { $updatePayload["semanticModelId"] = $SemanticModelId }
+
+        $updatePayloadJson = $updatePayload | ConvertTo-Json -Depth 50 -Compress
+        # Discard the response body so it does not leak into this function's return value
+        $null = Invoke-RestMethod -Uri $updateUrl -WebSession $script:FabricUploadSession -TimeoutSec $script:UploadTimeoutSec -Method Post -Body $updatePayloadJson -Headers $headers -ErrorAction Stop
+        Write-Host "✅ Report updated successfully"
+        return $existingReport.id
     }
     catch {
-        Write-Error "Failed to deploy report: $_"
+        Write-Error "Failed to deploy report: $(Get-BoundedText "$_")"
         return $null
     }
 }
@@ -783,11 +929,14 @@ function Deploy-PBIPUsingFabricAPI {
             throw "Invalid PBIP structure for: $ReportName"
         }
         
-        Debug-PBIPContent -PBIPFilePath $PBIPFilePath
+        # Recursive folder analysis is diagnostic only; run it with -Verbose or a System.Debug pipeline run
+        if ($VerbosePreference -ne 'SilentlyContinue' -or $env:SYSTEM_DEBUG -eq 'true') {
+            Debug-PBIPContent -PBIPFilePath $PBIPFilePath
+        }
         
         # Step 4: Deploy Semantic Model
         Write-Host "`n--- STEP 4: SEMANTIC MODEL DEPLOYMENT ---"
-        $semanticModelResult = Deploy-SemanticModel -SemanticModelFolder $validation.SemanticModelFolder -WorkspaceId $WorkspaceId -AccessToken $AccessToken -ModelName $ReportName -ServerName $ServerName -DatabaseName $DatabaseName
+        $semanticModelResult = Deploy-SemanticModel -SemanticModelFolder $validation.SemanticModelFolder -WorkspaceId $WorkspaceId -AccessToken $AccessToken -ModelName $ReportName -ServerName $ServerName -DatabaseName $DatabaseName -ModelBimPath $validation.ModelBimFile
         
         if (-not $semanticModelResult.Success) {
             throw "Semantic model deployment failed: $($semanticModelResult.Error)"
@@ -802,7 +951,7 @@ function Deploy-PBIPUsingFabricAPI {
         
         # Step 5: Wait for semantic model to appear
         Write-Host "`n--- STEP 5: SEMANTIC MODEL VERIFICATION ---"
-        $semanticModelReady = Wait-ForDeploymentCompletion -WorkspaceId $WorkspaceId -AccessToken $AccessToken -ItemName $ReportName -ItemType "SemanticModel" -MaxWaitMinutes 3
+        $semanticModelReady = Wait-ForDeploymentCompletion -WorkspaceId $WorkspaceId -AccessToken $AccessToken -ItemName $ReportName -ItemType "SemanticModel" -ItemId $semanticModelId -MaxWaitMinutes 3
         
         if (-not $semanticModelReady) {
             Write-Warning "Semantic model not found after deployment, but continuing..."
@@ -814,13 +963,11 @@ function Deploy-PBIPUsingFabricAPI {
         
         if (-not $reportSuccess) {
             throw "Report deployment failed"
-        }else{
-            Start-Sleep -Seconds 30 # wait a bit before verification
         }
         
         # Step 7: Wait for report to appear
         Write-Host "`n--- STEP 7: REPORT VERIFICATION ---"
-        $reportReady = Wait-ForDeploymentCompletion -WorkspaceId $WorkspaceId -AccessToken $AccessToken -ItemName $ReportName -ItemType "Report" -MaxWaitMinutes 3
+        $reportReady = Wait-ForDeploymentCompletion -WorkspaceId $WorkspaceId -AccessToken $AccessToken -ItemName $ReportName -ItemType "Report" -ItemId $reportSuccess -MaxWaitMinutes 3
         
         # Step 8: Final verification
         Write-Host "`n--- STEP 8: FINAL VERIFICATION ---"
@@ -828,10 +975,14 @@ function Deploy-PBIPUsingFabricAPI {
         
         # Step 9: Post-deployment inventory
         Write-Host "`n--- STEP 9: POST-DEPLOYMENT INVENTORY ---"
-        $postDeploymentItems = List-WorkspaceItems -WorkspaceId $WorkspaceId -AccessToken $AccessToken
-        Write-Host "Post-deployment: Found $($postDeploymentItems.Count) items in workspace"
+        # Reuse the listing Step 8 just fetched; only list again if verification could not reach the API
+        $postDeploymentCount = $verificationResult.ItemCount
+        if ($null -eq $postDeploymentCount) {
+            $postDeploymentCount = @(List-WorkspaceItems -WorkspaceId $WorkspaceId -AccessToken $AccessToken).Count
+        }
+        Write-Host "Post-deployment: Found $postDeploymentCount items in workspace"
         
-        $newItems = $postDeploymentItems.Count - $preDeploymentItems.Count
+        $newItems = $postDeploymentCount - $preDeploymentItems.Count
         if ($newItems -gt 0) {
             Write-Host "✓ Added $newItems new item(s) to workspace"
         } else {
@@ -903,7 +1054,9 @@ try {
         throw "Configuration file not found: $ConfigFile"
     }
 
-    $config = Get-Content -Raw $ConfigFile | ConvertFrom-Json
+    # Single direct read; Resolve-Path first because .NET resolves relative paths against the process directory
+    $configPath = (Resolve-Path -LiteralPath $ConfigFile).ProviderPath
+    $config = [System.IO.File]::ReadAllText($configPath) | ConvertFrom-Json
     Write-Host "Configuration loaded successfully"
 
     # Get SPN credentials from config
@@ -957,9 +1110,9 @@ try {
     $allPbipFiles = @()
     
     foreach ($folder in $reportFolders) {
-        $folderPath = Join-Path $artifactPath $folder
-        if (Test-Path $folderPath) {
-            $pbipFiles = Get-PBIPFiles -ArtifactPath $artifactPath -Folder $folder
+        # Get-PBIPFiles checks the folder exists, so there is no separate Test-Path here
+        $pbipFiles = @(Get-PBIPFiles -ArtifactPath $artifactPath -Folder $folder)
+        if ($pbipFiles.Count -gt 0) {
             $allPbipFiles += $pbipFiles
             Write-Host "Found $($pbipFiles.Count) PBIP files in $folder folder"
         }
@@ -1016,12 +1169,18 @@ try {
 
     # Summary
     Write-Host "`n=== DEPLOYMENT SUMMARY ==="
-    $successCount = ($deploymentResults | Where-Object { $_.DeploymentSuccess }).Count
+    # Tally the results in one pass; the counts and the failed-report list below all reuse it
+    $successCount = 0
+    $failedReports = @()
+    foreach ($result in $deploymentResults) {
+        if ($result.DeploymentSuccess) { $successCount++ } else { $failedReports += $result.ReportName }
+    }
     $totalCount = $deploymentResults.Count
+    $failedCount = $failedReports.Count
     
     Write-Host "Total PBIP files processed: $totalCount"
     Write-Host "Successful deployments: $successCount"
-    Write-Host "Failed deployments: $($totalCount - $successCount)"
+    Write-Host "Failed deployments: $failedCount"
 
     # Display detailed results
     Write-Host "`n=== DETAILED RESULTS ==="
@@ -1031,8 +1190,7 @@ try {
     }
 
     # Fail the deployment if any PBIP file failed to deploy
-    if ($successCount -lt $totalCount) {
-        $failedReports = $deploymentResults | Where-Object { -not $_.DeploymentSuccess } | Select-Object -ExpandProperty ReportName
+    if ($failedCount -gt 0) {
         Write-Error "The following reports failed to deploy: $($failedReports -join ', ')"
         throw "One or more PBIP deployments failed"
     }
@@ -1045,7 +1203,7 @@ try {
     Write-Host "Workspace ID: $targetWorkspaceId"
     Write-Host "Total Reports: $totalCount"
     Write-Host "Successful Deployments: $successCount"
-    Write-Host "Failed Deployments: $($totalCount - $successCount)"
+    Write-Host "Failed Deployments: $failedCount"
     Write-Host "Success Rate: $([math]::Round(($successCount / $totalCount) * 100, 2))%"
     Write-Host "Deployment Completed: $(Get-Date -Format 'yyyy-MM-dd HH:mm:ss')"
     Write-Host "========================================="